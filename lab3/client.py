@@ -12,18 +12,23 @@ class SimpleTCPClient:
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.connect((self.host, self.port))
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             print(f"Connected to {self.host}:{self.port}")
             return True
         except Exception as e:
             print(f"Connection failed: {e}")
             return False
 
-    def serialize_command(self, *args: str) -> str:
+    def serialize_command(self, *args: str) -> bytes:
         """Serialize command to RESP format"""
-        command = f"*{len(args)}\r\n"
+        parts = [b"*%d\r\n" % len(args)]
         for arg in args:
-            command += f"${len(arg)}\r\n{arg}\r\n"
-        return command
+            data = arg.encode('utf-8')
+            # Length prefix counts encoded bytes, not characters
+            parts.append(b"$%d\r\n" % len(data))
+            parts.append(data)
+            parts.append(b"\r\n")
+        return b"".join(parts)
 
     def parse_response(self, response: str) -> str:
         """Parse RESP response"""
@@ -48,8 +53,8 @@ class SimpleTCPClient:
     def send_command(self, *args: str) -> str:
         try:
             command = self.serialize_command(*args)
-            self.socket.send(command.encode('utf-8'))
-            response = self.socket.recv(4096).decode('utf-8')
+            self.socket.sendall(command)
+            response = self.socket.recv(65536).decode('utf-8')
             return self.parse_response(response)
         except Exception as e:
             return f"ERROR: {e}"
@@ -1,13 +1,25 @@
 import socket
 import time
 
-for i in range(300):
-    s = socket.socket()
-    s.connect(('localhost', 6379))
-    s.send(b'*5\r\n$3\r\nSET\r\n$4\r\nkey\r\n$5\r\nvalue\r\n$2\r\nEX\r\n$1\r\n2\r\n')
-    s.recv(1024)
-    time.sleep(0.01)
-    s.send(b'*2\r\n$3\r\nGET\r\n$3\r\nkey\r\n')
-    s.recv(1024)
-    s.close()
-    time.sleep(0.01)
+SET_CMD = b'*5\r\n$3\r\nSET\r\n$3\r\nkey\r\n$5\r\nvalue\r\n$2\r\nEX\r\n$1\r\n2\r\n'
+GET_CMD = b'*2\r\n$3\r\nGET\r\n$3\r\nkey\r\n'
+
+# Pipeline all 300 SET/GET pairs in one write instead of 600 round-trips
+payload = b''.join([SET_CMD, GET_CMD] * 300)
+
+start = time.time()
+s = socket.socket()
+s.connect(('localhost', 6379))
+s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+s.sendall(payload)
+# Half-close so the server sees EOF after the last command and closes once
+# every reply has been sent
+s.shutdown(socket.SHUT_WR)
+received = 0
+while True:
+    chunk = s.recv(65536)
+    if not chunk:
+        break
+    received += len(chunk)
+s.close()
+print(f"Received {received} reply bytes in {time.time() - start:.3f}s")
@@ -3,17 +3,52 @@
 Single-threaded TCP Server with Redis-like command processing
 Supports SET, GET commands with key expiration (EXPIRE) and RESP protocol
 """
+import heapq
+import logging
+import logging.handlers
+import os
+import queue
 import socket
 import sys
 import time
-from typing import Dict, Optional, List, Tuple
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+_LOG_PREVIEW = 64
+
+_OK = b"+OK\r\n"
+_NIL = b"$-1\r\n"
+_ERR_EMPTY = b"-ERROR: Empty command\r\n"
+_ERR_SET_ARGS = b"-ERROR: SET requires key and value\r\n"
+_ERR_GET_ARGS = b"-ERROR: GET requires key\r\n"
+_ERR_EX_MISSING = b"-ERROR: EX requires a number\r\n"
+_ERR_EX_POSITIVE = b"-ERROR: EX seconds must be positive\r\n"
+_ERR_EX_INTEGER = b"-ERROR: EX requires an integer\r\n"
+
+# Replies are sent mid-batch once they pass this many bytes
+_MAX_PENDING = 256 * 1024
+
+def start_logging() -> logging.handlers.QueueListener:
+    """Send log records through a queue drained by a background thread"""
+    log_queue = queue.SimpleQueue()
+    logging.basicConfig(
+        format='%(message)s',
+        handlers=[logging.handlers.QueueHandler(log_queue)],
+    )
+    logger.setLevel(logging.DEBUG if os.getenv('DEBUG') else logging.INFO)
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    return listener
 
 class SimpleTCPServer:
     def __init__(self, host: str = 'localhost', port: int = 6379):
         self.host = host
         self.port = port
-        self.storage: Dict[str, str] = {}
-        self.expire: Dict[str, float] = {}  # key -> expire timestamp (epoch)
+        self.storage: Dict[bytes, bytes] = {}
+        self.expire: Dict[bytes, float] = {}  # key -> expire time (time.monotonic())
+        # Min-heap of (expire time, key); stale entries are skipped when popped
+        self.expire_heap: List[Tuple[float, bytes]] = []
         self.socket = None
         
     def start(self):
@@ -22,13 +57,14 @@ class SimpleTCPServer:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.socket.bind((self.host, self.port))
-            self.socket.listen(1)
+            self.socket.listen(min(4096, socket.SOMAXCONN))
             print(f"Server listening on {self.host}:{self.port}")
             print("Waiting for connections...")
             
             while True:
                 client_socket, client_address = self.socket.accept()
                 print(f"Connection from {client_address}")
+                client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
                 try:
                     self.handle_client(client_socket)
                 except Exception as e:
@@ -46,97 +82,122 @@ class SimpleTCPServer:
     
     def handle_client(self, client_socket: socket.socket):
         """Handle client requests in a loop"""
-        buffer = ""
+        buffer = bytearray()
+        pos = 0  # Start of the first command not yet run
+        recv = client_socket.recv
+        find = buffer.find
+        process_command = self.process_command
         while True:
+            out = bytearray()
             try:
-                data = client_socket.recv(1024).decode('utf-8')
+                data = recv(65536)
                 if not data:
                     break
                 
                 buffer += data
-                while '\r\n' in buffer:
-                    command, buffer = self.parse_resp(buffer)
-                    if not command:
+                debug = logger.isEnabledFor(logging.DEBUG)
+                now = time.monotonic()
+                self.cleanup_expired_keys(now)
+                while True:
+                    end = find(b'\r\n', pos)
+                    if end == -1:
                         break
-                    
-                    print(f"Received RESP: {command}")
-                    self.cleanup_expired_keys()
-                    response = self.process_command(command)
-                    client_socket.send(self.serialize_resp(response).encode('utf-8'))
-                    print(f"Sent RESP: {response}")
+                    if buffer[pos] != ord('*'):
+                        command = bytes(buffer[pos:end]).split()
+                        cursor = end + 2
+                    else:
+                        try:
+                            count = int(buffer[pos + 1:end])
+                        except ValueError:
+                            buffer.clear()
+                            pos = 0
+                            raise ValueError("Protocol error: invalid multibulk length")
+                        cursor = end + 2
+
+                        command = None
+                        spans = []
+                        for _ in range(count):
+                            end = find(b'\r\n', cursor)
+                            if end == -1:
+                                break
+                            if buffer[cursor] != ord('$'):
+                                buffer.clear()
+                                pos = 0
+                                raise ValueError("Protocol error: expected '$'")
+                            try:
+                                length = int(buffer[cursor + 1:end])
+                            except ValueError:
+                                length = -1
+                            if length < 0:
+                                buffer.clear()
+                                pos = 0
+                                raise ValueError("Protocol error: invalid bulk length")
+                            start = end + 2
+                            cursor = start + length + 2
+                            if len(buffer) < cursor:
+                                break
+                            if buffer[cursor - 2:cursor] != b'\r\n':
+                                buffer.clear()
+                                pos = 0
+                                raise ValueError("Protocol error: bad bulk string length")
+                            spans.append((start, start + length))
+                        else:
+                            with memoryview(buffer) as view:
+                                command = [bytes(view[start:end]) for start, end in spans]
+                        if command is None:
+                            break
+                    pos = cursor
+                    if not command:
+                        # Blank line, *0 or *-1: nothing to run or answer
+                        continue
+
+                    if debug:
+                        logger.debug("Received RESP: %s", [part[:_LOG_PREVIEW] for part in command])
+                    response = process_command(command, now)
+                    out += response
+                    if debug:
+                        logger.debug("Sent RESP: %s", response[:_LOG_PREVIEW])
+                    if len(out) >= _MAX_PENDING:
+                        client_socket.sendall(out)
+                        out = bytearray()
+
+                if pos == len(buffer) or pos > 65536:
+                    del buffer[:pos]
+                    pos = 0
+                if out:
+                    client_socket.sendall(out)
                 
             except ConnectionResetError:
                 print("Client disconnected")
                 break
             except Exception as e:
-                error_response = f"-ERROR: {str(e)}\r\n"
-                client_socket.send(error_response.encode('utf-8'))
+                client_socket.sendall(out + b"-ERROR: %s\r\n" % str(e).encode('utf-8'))
                 print(f"Error: {e}")
 
-    def parse_resp(self, data: str) -> Tuple[Optional[List[str]], str]:
-        """Parse RESP protocol data"""
-        if not data.startswith('*'):
-            return None, data
-        
-        lines = data.split('\r\n')
-        if not lines:
-            return None, data
-        
-        try:
-            array_len = int(lines[0][1:])
-            if array_len <= 0:
-                return None, data
-            
-            command = []
-            index = 1
-            for _ in range(array_len):
-                if index >= len(lines) or not lines[index].startswith('$'):
-                    return None, data
-                bulk_len = int(lines[index][1:])
-                index += 1
-                if index >= len(lines) or len(lines[index]) != bulk_len:
-                    return None, data
-                command.append(lines[index])
-                index += 1
-            
-            remaining = '\r\n'.join(lines[index:]) if index < len(lines) else ""
-            return command, remaining
-        except ValueError:
-            return None, data
-
-    def serialize_resp(self, response: str) -> str:
-        """Serialize response to RESP format"""
-        if response.startswith('-'):
-            return f"{response}\r\n"
-        elif response == "(nil)":
-            return "$-1\r\n"
-        elif response == "OK":
-            return "+OK\r\n"
-        else:
-            return f"${len(response)}\r\n{response}\r\n"
-
-    def cleanup_expired_keys(self):
+    def cleanup_expired_keys(self, now: float):
         """Remove expired keys"""
-        now = time.time()
-        expired_keys = [k for k, exp in self.expire.items() if exp <= now]
-        for key in expired_keys:
-            print(f"Key expired and removed: {key}")
-            self.storage.pop(key, None)
-            self.expire.pop(key, None)
+        while self.expire_heap and self.expire_heap[0][0] <= now:
+            expire_time, key = heapq.heappop(self.expire_heap)
+            if self.expire.get(key) == expire_time:
+                logger.debug("Key expired and removed: %s", key)
+                self.storage.pop(key, None)
+                self.expire.pop(key, None)
     
-    def process_command(self, command: list) -> str:
-        """Process Redis-like commands"""
+    def process_command(self, command: List[bytes], now: float) -> bytes:
+        """Process Redis-like commands and return the RESP-encoded reply"""
         if not command:
-            return "-ERROR: Empty command"
+            return _ERR_EMPTY
         
         cmd = command[0].upper()
         
-        if cmd == "SET":
-            return self.handle_set(command[1:])
-        elif cmd == "GET":
-            return self.handle_get(command[1:])
+        if cmd == b"SET":
+            return self.handle_set(command[1:], now)
+        elif cmd == b"GET":
+            return self.handle_get(command[1:], now)
         else:
-            return f"-ERROR: Unknown command '{cmd}'"
+            # Bulk strings may hold CR/LF; echoing them would forge extra replies
+            name = cmd.replace(b'\r', b' ').replace(b'\n', b' ')
+            return b"-ERROR: Unknown command '%s'\r\n" % name
     
     def fibonacci(self, n):
         """Calculate Fibonacci number recursively"""
@@ -144,10 +205,10 @@ class SimpleTCPServer:
             return n
         return self.fibonacci(n-1) + self.fibonacci(n-2)
 
-    def handle_set(self, args: list) -> str:
+    def handle_set(self, args: List[bytes], now: float) -> bytes:
         """Handle SET key value [EX seconds]"""
         if len(args) < 2:
-            return "-ERROR: SET requires key and value"
+            return _ERR_SET_ARGS
         
         key = args[0]
         value = args[1]
@@ -157,48 +218,52 @@ class SimpleTCPServer:
             i = 2
             while i < len(args):
                 option = args[i].upper()
-                if option == "EX":
+                if option == b"EX":
                     i += 1
                     if i >= len(args):
-                        return "-ERROR: EX requires a number"
+                        return _ERR_EX_MISSING
                     try:
                         seconds = int(args[i])
                         if seconds <= 0:
-                            return "-ERROR: EX seconds must be positive"
-                        expire_time = time.time() + seconds
+                            return _ERR_EX_POSITIVE
+                        expire_time = now + seconds
                         # Add Fibonacci calculation for CPU load
                         self.fibonacci(20)  # CPU-intensive task
                     except ValueError:
-                        return "-ERROR: EX requires an integer"
+                        return _ERR_EX_INTEGER
                 else:
-                    return f"-ERROR: Unknown option '{args[i]}'"
+                    option = args[i].replace(b'\r', b' ').replace(b'\n', b' ')
+                    return b"-ERROR: Unknown option '%s'\r\n" % option
                 i += 1
         
         self.storage[key] = value
         if expire_time is not None:
             self.expire[key] = expire_time
-        elif key in self.expire:
-            self.expire.pop(key)
+            heapq.heappush(self.expire_heap, (expire_time, key))
+        else:
+            self.expire.pop(key, None)
         
-        return "OK"
+        return _OK
     
-    def handle_get(self, args: list) -> str:
+    def handle_get(self, args: List[bytes], now: float) -> bytes:
         """Handle GET key"""
         if len(args) < 1:
-            return "-ERROR: GET requires key"
+            return _ERR_GET_ARGS
         
         key = args[0]
         
-        if key in self.expire:
-            if self.expire[key] <= time.time():
-                self.storage.pop(key, None)
-                self.expire.pop(key, None)
-                return "(nil)"
+        expire_time = self.expire.get(key)
+        if expire_time is not None and expire_time <= now:
+            self.storage.pop(key, None)
+            del self.expire[key]
+            return _NIL
         
         # Add Fibonacci calculation for CPU load
         self.fibonacci(15)  # Extra CPU load
         value = self.storage.get(key)
-        return value if value is not None else "(nil)"
+        if value is None:
+            return _NIL
+        return b"$%d\r\n%s\r\n" % (len(value), value)
     
     def cleanup(self):
         """Clean up resources"""
@@ -206,5 +271,7 @@ class SimpleTCPServer:
             self.socket.close()
 
 if __name__ == "__main__":
+    listener = start_logging()
     server = SimpleTCPServer()
-    server.start()
\ No newline at end of file
+    server.start()
+    listener.stop()
@@ -4,9 +4,10 @@ TCP Client for connecting to the SimpleTCPServer
 Supports interactive mode and single command mode
 """
 
+import os
+import selectors
 import socket
 import sys
-import time
 
 class SimpleTCPClient:
     def __init__(self, host: str = 'localhost', port: int = 6379):
@@ -19,47 +20,81 @@ class SimpleTCPClient:
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.connect((self.host, self.port))
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             print(f"Connected to {self.host}:{self.port}")
             return True
         except Exception as e:
             print(f"Connection failed: {e}")
             return False
     
-    def send_command(self, command: str) -> str:
-        """Send command and receive response"""
-        try:
-            # Send command
-            self.socket.send((command + '\n').encode('utf-8'))
-            
-            # Receive response
-            response = self.socket.recv(1024).decode('utf-8').strip()
-            return response
-        except Exception as e:
-            return f"ERROR: {e}"
-    
     def interactive_mode(self):
         """Run in interactive mode"""
         print("Interactive mode. Type 'quit' to exit.")
         print("Supported commands: SET key value, GET keyG")
         
-        while True:
-            try:
-                command = input(f"{self.host}:{self.port}> ").strip()
-                if not command:
-                    continue
-                
-                if command.lower() == 'exit':
-                    break
-                
-                response = self.send_command(command)
-                print(response)
+        # Wait on keyboard and socket together so a slow or vanished server
+        # never leaves the prompt stuck inside recv(). stdin is read with
+        # os.read() on its fd: sys.stdin.readline() could leave lines in its
+        # own buffer where the selector cannot see them
+        stdin_fd = sys.stdin.fileno()
+        selector = selectors.DefaultSelector()
+        selector.register(stdin_fd, selectors.EVENT_READ)
+        selector.register(self.socket, selectors.EVENT_READ)
+        prompt = f"{self.host}:{self.port}> "
+        input_buffer = b''
+        stdin_open = True
+        buffer = b''
+        print(prompt, end='', flush=True)
+        
+        try:
+            while True:
+                for key, _ in selector.select():
+                    if key.fileobj == stdin_fd:
+                        data = os.read(stdin_fd, 65536)
+                        if data:
+                            input_buffer += data
+                            lines = input_buffer.split(b'\n')
+                            input_buffer = lines.pop()
+                        else:
+                            # EOF; the last line may lack a newline
+                            lines = [input_buffer]
+                            input_buffer = b''
+                            stdin_open = False
+                        
+                        for line in lines:
+                            command = line.decode('utf-8', 'replace').strip()
+                            if not command:
+                                continue
+                            if command.lower() in ('exit', 'quit'):
+                                stdin_open = False
+                                break
+                            self.socket.sendall((command + '\n').encode('utf-8'))
+                        
+                        if not stdin_open:
+                            # Stop sending, then keep reading until the server
+                            # has answered everything sent and closed its side
+                            selector.unregister(stdin_fd)
+                            self.socket.shutdown(socket.SHUT_WR)
+                    else:
+                        data = self.socket.recv(65536)
+                        if not data:
+                            if stdin_open:
+                                print("\nServer closed the connection")
+                            else:
+                                print("\nExiting...")
+                            return
+                        
+                        # Only print complete replies; keep any partial tail
+                        buffer += data
+                        while b'\n' in buffer:
+                            response, buffer = buffer.split(b'\n', 1)
+                            print(response.decode('utf-8', 'replace'))
+                            print(prompt, end='', flush=True)
                 
-            except KeyboardInterrupt:
-                print("\nExiting...")
-                break
-            except EOFError:
-                print("\nExiting...")
-                break
+        except KeyboardInterrupt:
+            print("\nExiting...")
+        finally:
+            selector.close()
     
     def close(self):
         """Close connection"""
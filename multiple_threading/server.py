@@ -1,113 +1,219 @@
 #!/usr/bin/env python3
 """
-Multi-threaded TCP Server with Redis-like command processing
-Handles multiple clients concurrently
+Event-loop TCP Server with Redis-like command processing
+Handles multiple clients concurrently on a single asyncio event loop,
+optionally sharded across forked worker processes with SO_REUSEPORT
 """
 
-import socket
+import asyncio
+import logging
+import logging.handlers
+import os
+import queue
 import sys
-import threading
 from typing import Dict, Optional
 
+logger = logging.getLogger(__name__)
+
+_LOG_PREVIEW = 64
+
+_OK = b"OK\n"
+_NIL = b"(nil)\n"
+_ERR_EMPTY = b"ERROR: Empty command\n"
+_ERR_SET_ARGS = b"ERROR: SET requires key and value\n"
+_ERR_GET_ARGS = b"ERROR: GET requires key\n"
+
+# Pending replies are flushed once they pass this size, so a client that
+# pipelines large GETs without reading cannot grow them without bound
+_MAX_PENDING = 256 * 1024
+
+def start_logging() -> logging.handlers.QueueListener:
+    """Send log records through a queue drained by a background thread"""
+    log_queue = queue.SimpleQueue()
+    logging.basicConfig(
+        format='%(message)s',
+        handlers=[logging.handlers.QueueHandler(log_queue)],
+    )
+    logger.setLevel(logging.DEBUG if os.getenv('DEBUG') else logging.INFO)
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    return listener
+
 class SimpleTCPServer:
-    def __init__(self, host: str = 'localhost', port: int = 6379):
+    def __init__(self, host: str = 'localhost', port: int = 6379, workers: int = 1,
+                 max_clients: int = 1024):
         self.host = host
         self.port = port
-        self.storage: Dict[str, str] = {}
-        self.socket = None
-        self.lock = threading.Lock()  # Lock for thread-safe storage access
-        
+        # Each worker process owns its own storage (shared-nothing), so keys
+        # are only visible to connections the kernel routes to that worker
+        self.workers = workers
+        # Per-worker cap on connections being served at once
+        self.max_clients = max_clients
+        self.client_slots: Optional[asyncio.Semaphore] = None
+        self.storage: Dict[bytes, bytes] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+
     def start(self):
         """Start the TCP server"""
+        if self.workers > 1:
+            self.start_workers()
+        else:
+            self.run()
+
+    def start_workers(self):
+        """Fork worker processes that each accept on the shared port"""
+        pids = []
+        for _ in range(self.workers):
+            pid = os.fork()
+            if pid == 0:
+                self.run()
+                os._exit(0)
+            pids.append(pid)
+        print(f"Started {len(pids)} workers: {pids}")
+        running = set(pids)
         try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.socket.bind((self.host, self.port))
-            self.socket.listen(5)
-            print(f"Server listening on {self.host}:{self.port}")
-            
-            while True:
-                client_socket, client_address = self.socket.accept()
-                print(f"Connection from {client_address}")
-                
-                # Start a new thread for each client
-                client_thread = threading.Thread(
-                    target=self.handle_client,
-                    args=(client_socket, client_address)
-                )
-                client_thread.start()
-                
+            while running:
+                pid, _ = os.wait()
+                running.discard(pid)
+        except KeyboardInterrupt:
+            # Workers get the same SIGINT and shut down on their own
+            for pid in running:
+                os.waitpid(pid, 0)
+
+    def run(self):
+        """Run one event loop until interrupted"""
+        # Started per process: the listener thread does not survive fork()
+        listener = start_logging()
+        try:
+            asyncio.run(self.serve())
         except KeyboardInterrupt:
             print("\nShutting down server...")
         except Exception as e:
             print(f"Server error: {e}")
         finally:
-            self.cleanup()
-    
-    def handle_client(self, client_socket: socket.socket, client_address: tuple):
-        """Handle client requests in a loop"""
+            listener.stop()
+
+    async def serve(self):
+        """Accept connections and serve them from one event loop"""
+        self.client_slots = asyncio.Semaphore(self.max_clients)
+        self.server = await asyncio.start_server(
+            self.handle_client, self.host, self.port, backlog=4096,
+            reuse_port=self.workers > 1
+        )
+        print(f"Server listening on {self.host}:{self.port}")
         try:
-            while True:
-                data = client_socket.recv(1024).decode('utf-8').strip()
-                if not data:
-                    break
-                
-                print(f"Received from {client_address}: {data}")
-                response = self.process_command(data)
-                client_socket.send((response + '\n').encode('utf-8'))
-                print(f"Sent to {client_address}: {response}")
-                
-        except ConnectionResetError:
-            print(f"Client {client_address} disconnected")
-        except Exception as e:
-            error_response = f"ERROR: {str(e)}"
-            client_socket.send((error_response + '\n').encode('utf-8'))
-            print(f"Error for {client_address}: {e}")
+            async with self.server:
+                await self.server.serve_forever()
         finally:
-            client_socket.close()
-            print(f"Connection closed for {client_address}")
-    
-    def process_command(self, command: str) -> str:
+            self.cleanup()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle client requests in a loop"""
+        client_address = writer.get_extra_info('peername')
+        print(f"Connection from {client_address}")
+        # Connections past the cap wait here without being read from
+        async with self.client_slots:
+            replies = []
+            pending = 0
+            try:
+                buffer = bytearray()
+                while True:
+                    data = await reader.read(65536)
+                    if not data:
+                        if not buffer:
+                            break
+                        # Run a last command that ends at EOF without a newline
+                        data = b'\n'
+                    buffer += data
+
+                    # Run every complete command from this read and answer
+                    # them with a single write
+                    debug = logger.isEnabledFor(logging.DEBUG)
+                    start = 0
+                    while True:
+                        end = buffer.find(b'\n', start)
+                        if end == -1:
+                            break
+                        line = bytes(buffer[start:end + 1])
+                        start = end + 1
+
+                        if debug:
+                            logger.debug("Received from %s: %r", client_address, line[:_LOG_PREVIEW])
+                        response = self.process_command(line)
+                        replies.append(response)
+                        pending += len(response)
+                        if debug:
+                            logger.debug("Sent to %s: %r", client_address, response[:_LOG_PREVIEW])
+                        if pending >= _MAX_PENDING:
+                            writer.write(b''.join(replies))
+                            replies = []
+                            pending = 0
+                            await writer.drain()
+                    # Keep only the trailing partial command
+                    del buffer[:start]
+
+                    if replies:
+                        writer.write(b''.join(replies))
+                        replies = []
+                        pending = 0
+                        await writer.drain()
+
+            except ConnectionResetError:
+                print(f"Client {client_address} disconnected")
+            except Exception as e:
+                error_response = f"ERROR: {str(e)}"
+                # Commands before the failure already ran, so their replies
+                # go out ahead of the error to keep the order
+                writer.write(b''.join(replies) + (error_response + '\n').encode('utf-8'))
+                print(f"Error for {client_address}: {e}")
+            finally:
+                writer.close()
+                print(f"Connection closed for {client_address}")
+
+    def process_command(self, command: bytes) -> bytes:
         """Process Redis-like commands"""
-        parts = command.split()
+        # Split off the command name only; handlers parse the rest themselves
+        parts = command.split(None, 1)
         if not parts:
-            return "ERROR: Empty command"
-        
-        cmd = parts[0].upper()
-        
-        if cmd == "SET":
-            return self.handle_set(parts[1:])
-        elif cmd == "GET":
-            return self.handle_get(parts[1:])
-        else:
-            return f"ERROR: Unknown command '{cmd}'"
-    
-    def handle_set(self, args: list) -> str:
+            return _ERR_EMPTY
+
+        handler = self._HANDLERS.get(parts[0].upper())
+        if handler is None:
+            return b"ERROR: Unknown command '%s'\n" % parts[0].upper()
+        return handler(self, parts[1] if len(parts) > 1 else b'')
+
+    def handle_set(self, rest: bytes) -> bytes:
         """Handle SET key value"""
+        args = rest.split(None, 1)
         if len(args) < 2:
-            return "ERROR: SET requires key and value"
-        
-        key = args[0]
-        value = ' '.join(args[1:])
-        with self.lock:  # Thread-safe storage access
-            self.storage[key] = value
-        return "OK"
-    
-    def handle_get(self, args: list) -> str:
+            return _ERR_SET_ARGS
+
+        # The value is the remainder of the line as sent, spaces included
+        key, value = args
+        # No lock needed: handlers never yield to the event loop
+        self.storage[key] = value.rstrip()
+        return _OK
+
+    def handle_get(self, rest: bytes) -> bytes:
         """Handle GET key"""
+        args = rest.split(None, 1)
         if len(args) < 1:
-            return "ERROR: GET requires key"
-        
+            return _ERR_GET_ARGS
+
         key = args[0]
-        with self.lock:  # Thread-safe storage access
-            value = self.storage.get(key)
-        return value if value is not None else "(nil)"
-    
+        value = self.storage.get(key)
+        return value + b"\n" if value is not None else _NIL
+
+    _HANDLERS = {b"SET": handle_set, b"GET": handle_get}
+
     def cleanup(self):
         """Clean up resources"""
-        if self.socket:
-            self.socket.close()
+        if self.server:
+            self.server.close()
 
 if __name__ == "__main__":
-    server = SimpleTCPServer()
-    server.start()
\ No newline at end of file
+    server = SimpleTCPServer(
+        workers=int(os.getenv('SERVER_WORKERS', 1)),
+        max_clients=int(os.getenv('MAX_CLIENTS', 1024))
+    )
+    server.start()
@@ -12,6 +12,7 @@ class SimpleTCPClient:
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.connect((self.host, self.port))
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             print(f"Connected to {self.host}:{self.port}")
             return True
         except Exception as e:
@@ -20,8 +21,8 @@ class SimpleTCPClient:
 
     def send_command(self, command: str) -> str:
         try:
-            self.socket.send((command + '\n').encode('utf-8'))
-            response = self.socket.recv(4096).decode('utf-8').strip()
+            self.socket.sendall((command + '\n').encode('utf-8'))
+            response = self.socket.recv(65536).decode('utf-8').strip()
             return response
         except Exception as e:
             return f"ERROR: {e}"
@@ -64,14 +65,14 @@ class SimpleTCPClient:
                 for _ in range(repeat):
                     # SET
                     start = time.time()
-                    self.socket.send((f"SET {key} {value}\n").encode('utf-8'))
-                    self.socket.recv(4096)
+                    self.socket.sendall((f"SET {key} {value}\n").encode('utf-8'))
+                    self.socket.recv(65536)
                     total_set += (time.time() - start)
 
                     # GET
                     start = time.time()
-                    self.socket.send((f"GET {key}\n").encode('utf-8'))
-                    self.socket.recv(4096)
+                    self.socket.sendall((f"GET {key}\n").encode('utf-8'))
+                    self.socket.recv(65536)
                     total_get += (time.time() - start)
 
                 print(f"\n Key: {key_kb}KB | Value: {val_kb}KB | Repeats: {repeat}")
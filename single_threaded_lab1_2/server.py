@@ -2,20 +2,67 @@
 """
 Single-threaded TCP Server with Redis-like command processing
 Supports SET and GET commands with key expiration (EXPIRE)
+Serves all clients from one selectors-based event loop
 """
 
+import heapq
+import logging
+import logging.handlers
+import os
+import queue
+import selectors
 import socket
 import sys
 import time
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_LOG_PREVIEW = 64
+
+_OK = b"OK\n"
+_NIL = b"(nil)\n"
+_ERR_EMPTY = b"ERROR: Empty command\n"
+_ERR_SET_ARGS = b"ERROR: SET requires key and value\n"
+_ERR_GET_ARGS = b"ERROR: GET requires key\n"
+
+# Commands stop running once this many reply bytes are waiting to be sent;
+# the rest stay in the input buffer until the replies drain
+_MAX_PENDING = 256 * 1024
+
+def start_logging() -> logging.handlers.QueueListener:
+    """Send log records through a queue drained by a background thread"""
+    log_queue = queue.SimpleQueue()
+    logging.basicConfig(
+        format='%(message)s',
+        handlers=[logging.handlers.QueueHandler(log_queue)],
+    )
+    logger.setLevel(logging.DEBUG if os.getenv('DEBUG') else logging.INFO)
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    return listener
+
+class ClientConnection:
+    """Per-client state for the event loop"""
+    def __init__(self, client_socket: socket.socket, address: tuple):
+        self.socket = client_socket
+        self.address = address
+        self.inbound = bytearray()   # Received bytes not yet parsed
+        self.outbound = bytearray()  # Replies not yet written
+        self.eof = False             # Peer stopped sending; close once replies drain
 
 class SimpleTCPServer:
     def __init__(self, host: str = 'localhost', port: int = 6379):
         self.host = host
         self.port = port
-        self.storage: Dict[str, str] = {}
-        self.expire: Dict[str, float] = {}  # key -> expire timestamp (epoch)
+        self.storage: Dict[bytes, bytes] = {}
+        self.expire: Dict[bytes, float] = {}  # key -> expire timestamp (epoch)
+        # Min-heap of (expire timestamp, key); entries whose timestamp no
+        # longer matches self.expire are stale and skipped when popped
+        self.expire_heap: List[Tuple[float, bytes]] = []
         self.socket = None
+        self.selector = selectors.DefaultSelector()
+        self.clients: Dict[socket.socket, ClientConnection] = {}
         
     def start(self):
         """Start the TCP server"""
@@ -26,23 +73,21 @@ class SimpleTCPServer:
             
             # Bind and listen
             self.socket.bind((self.host, self.port))
-            self.socket.listen(1)  # Single connection at a time
+            self.socket.listen(min(4096, socket.SOMAXCONN))
+            
+            # One thread multiplexes the listener and every client socket
+            self.socket.setblocking(False)
+            self.selector.register(self.socket, selectors.EVENT_READ)
             
             print(f"Server listening on {self.host}:{self.port}")
             print("Waiting for connections...")
             
             while True:
-                # Accept connection (blocks here for single-threaded behavior)
-                client_socket, client_address = self.socket.accept()
-                print(f"Connection from {client_address}")
-                
-                try:
-                    self.handle_client(client_socket)
-                except Exception as e:
-                    print(f"Error handling client {client_address}: {e}")
-                finally:
-                    client_socket.close()
-                    print(f"Connection closed for {client_address}")
+                for key, mask in self.selector.select():
+                    if key.data is None:
+                        self.accept_client()
+                    else:
+                        self.handle_client(key.data, mask)
                     
         except KeyboardInterrupt:
             print("\nShutting down server...")
@@ -51,63 +96,144 @@ class SimpleTCPServer:
         finally:
             self.cleanup()
     
-    def handle_client(self, client_socket: socket.socket):
-        """Handle client requests in a loop"""
-        while True:
+    def accept_client(self):
+        """Accept a pending connection and watch it for commands"""
+        try:
+            client_socket, client_address = self.socket.accept()
+        except BlockingIOError:
+            return
+        except OSError as e:
+            print(f"Accept error: {e}")
+            return
+        print(f"Connection from {client_address}")
+        try:
+            client_socket.setblocking(False)
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as e:
+            print(f"Error: {e}")
+            client_socket.close()
+            return
+        client = ClientConnection(client_socket, client_address)
+        self.clients[client_socket] = client
+        self.selector.register(client_socket, selectors.EVENT_READ, client)
+    
+    def handle_client(self, client: ClientConnection, mask: int):
+        """Handle a readiness event for one client"""
+        if mask & selectors.EVENT_READ:
             try:
-                # Receive data
-                data = client_socket.recv(1024).decode('utf-8').strip()
-                if not data:
-                    break
-                
-                print(f"Received: {data}")
-                
-                # Cleanup expired keys on every command
-                self.cleanup_expired_keys()
-                
-                # Process command
-                response = self.process_command(data)
-                
-                # Send response
-                client_socket.send((response + '\n').encode('utf-8'))
-                print(f"Sent: {response}")
-                
+                data = client.socket.recv(65536)
+            except BlockingIOError:
+                return
             except ConnectionResetError:
                 print("Client disconnected")
+                self.close_client(client)
+                return
+            except OSError as e:
+                print(f"Error: {e}")
+                self.close_client(client)
+                return
+            if not data:
+                if not client.inbound:
+                    self.close_client(client)
+                    return
+                # Run a last command that ends at EOF without a newline
+                data = b'\n'
+                client.eof = True
+            client.inbound += data
+            self.process_buffer(client)
+        self.flush_client(client)
+    
+    def process_buffer(self, client: ClientConnection):
+        """Run complete commands from the client's input buffer until the
+        pending replies reach _MAX_PENDING"""
+        buffer = client.inbound
+        outbound = client.outbound
+        debug = logger.isEnabledFor(logging.DEBUG)
+        start = 0
+        while len(outbound) < _MAX_PENDING:
+            end = buffer.find(b'\n', start)
+            if end == -1:
                 break
+            line = bytes(buffer[start:end + 1])
+            start = end + 1
+            
+            if debug:
+                logger.debug("Received: %r", line[:_LOG_PREVIEW])
+            try:
+                # Cleanup expired keys on every command
+                self.cleanup_expired_keys()
+                response = self.process_command(line)
             except Exception as e:
-                error_response = f"ERROR: {str(e)}"
-                client_socket.send((error_response + '\n').encode('utf-8'))
+                response = f"ERROR: {str(e)}\n".encode('utf-8')
                 print(f"Error: {e}")
+            outbound += response
+            if debug:
+                logger.debug("Sent: %r", response[:_LOG_PREVIEW])
+        # Keep only the commands not yet run
+        del buffer[:start]
+    
+    def flush_client(self, client: ClientConnection):
+        """Send pending replies, waiting for writability if the socket is full"""
+        while client.outbound:
+            try:
+                sent = client.socket.send(client.outbound)
+            except BlockingIOError:
+                break
+            except (ConnectionResetError, BrokenPipeError):
+                print("Client disconnected")
+                self.close_client(client)
+                return
+            except OSError as e:
+                print(f"Error: {e}")
+                self.close_client(client)
+                return
+            del client.outbound[:sent]
+            if len(client.outbound) < _MAX_PENDING:
+                # Run the commands held back by the output cap
+                self.process_buffer(client)
+        if client.eof and not client.outbound:
+            self.close_client(client)
+            return
+        # Stop reading while replies are backed up so a client that never
+        # reads cannot make the server buffer without bound
+        events = selectors.EVENT_WRITE if client.outbound else selectors.EVENT_READ
+        if self.selector.get_key(client.socket).events != events:
+            self.selector.modify(client.socket, events, client)
+    
+    def close_client(self, client: ClientConnection):
+        """Stop watching a client and close its socket"""
+        self.selector.unregister(client.socket)
+        del self.clients[client.socket]
+        client.socket.close()
+        print(f"Connection closed for {client.address}")
 
     def cleanup_expired_keys(self):
         """Remove expired keys"""
         now = time.time()
-        expired_keys = [k for k, exp in self.expire.items() if exp <= now]
-        for key in expired_keys:
-            print(f"Key expired and removed: {key}")
-            self.storage.pop(key, None)
-            self.expire.pop(key, None)
+        # Only look at keys due by now instead of scanning every expiration
+        while self.expire_heap and self.expire_heap[0][0] <= now:
+            expire_time, key = heapq.heappop(self.expire_heap)
+            if self.expire.get(key) == expire_time:
+                logger.debug("Key expired and removed: %r", key)
+                self.storage.pop(key, None)
+                self.expire.pop(key, None)
     
-    def process_command(self, command: str) -> str:
+    def process_command(self, command: bytes) -> bytes:
         """Process Redis-like commands"""
+        # bytes.split() also drops the trailing newline
         parts = command.split()
         if not parts:
-            return "ERROR: Empty command"
-        
-        cmd = parts[0].upper()
+            return _ERR_EMPTY
         
-        if cmd == "SET":
-            return self.handle_set(parts[1:])
-        elif cmd == "GET":
-            return self.handle_get(parts[1:])
-        else:
-            return f"ERROR: Unknown command '{cmd}'"
+        handler = self._HANDLERS.get(parts[0].upper())
+        if handler is None:
+            return b"ERROR: Unknown command '%s'\n" % parts[0].upper()
+        return handler(self, parts[1:])
     
-    def handle_set(self, args: list) -> str:
+    def handle_set(self, args: list) -> bytes:
         """Handle SET key value [EX seconds]"""
         if len(args) < 2:
-            return "ERROR: SET requires key and value"
+            return _ERR_SET_ARGS
         
         key = args[0]
         value = args[1]
@@ -120,53 +246,61 @@ class SimpleTCPServer:
             i = 2
             while i < len(args):
                 option = args[i].upper()
-                if option == "EX":
+                if option == b"EX":
                     i += 1
                     if i >= len(args):
-                        return "ERROR: EX requires a number"
+                        return b"ERROR: EX requires a number\n"
                     try:
                         seconds = int(args[i])
                         if seconds <= 0:
-                            return "ERROR: EX seconds must be positive"
+                            return b"ERROR: EX seconds must be positive\n"
                         expire_time = time.time() + seconds
                     except ValueError:
-                        return "ERROR: EX requires an integer"
+                        return b"ERROR: EX requires an integer\n"
                 else:
-                    return f"ERROR: Unknown option '{args[i]}'"
+                    return b"ERROR: Unknown option '%s'\n" % args[i]
                 i += 1
         
         self.storage[key] = value
         if expire_time is not None:
             self.expire[key] = expire_time
-        elif key in self.expire:
+            heapq.heappush(self.expire_heap, (expire_time, key))
+        else:
             # Remove expiration if no EX provided
-            self.expire.pop(key)
+            self.expire.pop(key, None)
         
-        return "OK"
+        return _OK
     
-    def handle_get(self, args: list) -> str:
+    def handle_get(self, args: list) -> bytes:
         """Handle GET key"""
         if len(args) < 1:
-            return "ERROR: GET requires key"
+            return _ERR_GET_ARGS
         
         key = args[0]
         
-        # Check expiration first
-        if key in self.expire:
-            if self.expire[key] <= time.time():
-                # Key expired, delete it
-                self.storage.pop(key, None)
-                self.expire.pop(key, None)
-                return "(nil)"
+        # Check expiration first; one lookup when the key has no TTL
+        expire_time = self.expire.get(key)
+        if expire_time is not None and expire_time <= time.time():
+            # Key expired, delete it
+            self.storage.pop(key, None)
+            del self.expire[key]
+            return _NIL
         
         value = self.storage.get(key)
-        return value if value is not None else "(nil)"
+        return value + b"\n" if value is not None else _NIL
+    
+    _HANDLERS = {b"SET": handle_set, b"GET": handle_get}
     
     def cleanup(self):
         """Clean up resources"""
+        for client in list(self.clients.values()):
+            self.close_client(client)
+        self.selector.close()
         if self.socket:
             self.socket.close()
 
 if __name__ == "__main__":
+    listener = start_logging()
     server = SimpleTCPServer()
-    server.start()  
\ No newline at end of file
+    server.start()
+    listener.stop()
@@ -7,53 +7,88 @@ class SimpleTCPClient:
         self.host = host
         self.port = port
         self.socket = None
+        # Reused receive area so large replies don't allocate a new chunk per recv
+        self.recv_view = memoryview(bytearray(65536))
+        self.recv_buffer = bytearray()  # Received bytes not yet parsed
 
     def connect(self) -> bool:
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.connect((self.host, self.port))
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             print(f"Connected to {self.host}:{self.port}")
             return True
         except Exception as e:
             print(f"Connection failed: {e}")
             return False
 
-    def serialize_command(self, *args: str) -> str:
+    def serialize_command(self, *args) -> bytes:
         """Serialize command to RESP format"""
-        command = f"*{len(args)}\r\n"
+        parts = [b"*%d\r\n" % len(args)]
         for arg in args:
-            command += f"${len(arg)}\r\n{arg}\r\n"
-        return command
-
-    def parse_response(self, response: str) -> str:
+            # bytes arguments are used as-is, so large payloads are never re-encoded
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            # Length prefix counts encoded bytes, not characters
+            parts.append(b"$%d\r\n" % len(data))
+            parts.append(data)
+            parts.append(b"\r\n")
+        return b"".join(parts)
+
+    def parse_response(self, response: bytes) -> str:
         """Parse RESP response"""
         if not response:
             return "ERROR: Empty response"
         
+        # Only the header line is scanned; a bulk payload is sliced by length
+        end = response.find(b"\r\n")
+        if end == -1:
+            return "ERROR: Incomplete response"
         first_char = response[0]
-        if first_char == '+':
-            return response[1:-2]
-        elif first_char == '-':
-            return response[1:-2]
-        elif first_char == '$':
-            if response == "$-1\r\n":
+        if first_char == ord('+') or first_char == ord('-'):
+            return response[1:end].decode('utf-8')
+        elif first_char == ord('$'):
+            length = int(response[1:end])
+            if length == -1:
                 return "(nil)"
-            parts = response.split('\r\n')
-            if len(parts) < 2:
+            start = end + 2
+            if len(response) < start + length:
                 return "ERROR: Invalid bulk string"
-            return parts[1]
+            return response[start:start + length].decode('utf-8')
         else:
-            return f"ERROR: Unknown response format: {response}"
+            return f"ERROR: Unknown response format: {response.decode('utf-8', 'replace')}"
 
     def send_command(self, *args: str) -> str:
         try:
             command = self.serialize_command(*args)
-            self.socket.send(command.encode('utf-8'))
-            response = self.socket.recv(4096).decode('utf-8')
-            return self.parse_response(response)
+            self.socket.sendall(command)
+            return self.read_response()
         except Exception as e:
             return f"ERROR: {e}"
 
+    def pipeline(self, commands: list) -> list:
+        """Send many commands in one write, then read their replies in order"""
+        self.socket.sendall(b"".join(self.serialize_command(*args) for args in commands))
+        return [self.read_response() for _ in commands]
+
+    def read_response(self) -> str:
+        """Read one RESP reply; bytes received past it stay buffered for the next"""
+        buffer = self.recv_buffer
+        while True:
+            end = buffer.find(b"\r\n")
+            stop = end + 2
+            if end != -1 and buffer[:1] == b"$" and buffer[1:end] != b"-1":
+                # Bulk string: header, payload, trailing CRLF
+                stop += int(buffer[1:end]) + 2
+            if end != -1 and len(buffer) >= stop:
+                break
+            received = self.socket.recv_into(self.recv_view)
+            if not received:
+                raise ConnectionError("Connection closed by server")
+            buffer += self.recv_view[:received]
+        response = self.parse_response(buffer[:stop])
+        del buffer[:stop]
+        return response
+
     def interactive_mode(self):
         print("Interactive mode. Type 'quit' or 'exit' to exit.")
         print("Supported commands: SET key value [EX seconds], GET key")
@@ -75,7 +110,7 @@ class SimpleTCPClient:
         print("Benchmark mode: testing SET/GET with large keys and values")
 
         def generate_large_data(size_kb):
-            return 'x' * (size_kb * 1024)
+            return b'x' * (size_kb * 1024)
 
         key_sizes = [1, 5, 10]  # KB
         value_sizes = [10, 50, 100]  # KB
@@ -86,27 +121,23 @@ class SimpleTCPClient:
                 key = generate_large_data(key_kb)
                 value = generate_large_data(val_kb)
 
-                total_set = 0
-                total_get = 0
+                # Pipeline every SET, then every GET, in a single write
+                commands = [("SET", key, value)] * repeat + [("GET", key)] * repeat
 
-                for _ in range(repeat):
-                    # SET
-                    start = time.time()
-                    response = self.send_command("SET", key, value)
-                    if response != "OK":
-                        print(f"SET failed: {response}")
-                    total_set += (time.time() - start)
+                start = time.perf_counter()
+                responses = self.pipeline(commands)
+                total = time.perf_counter() - start
 
-                    # GET
-                    start = time.time()
-                    response = self.send_command("GET", key)
-                    if response == "(nil)":
-                        print(f"GET failed: Key not found")
-                    total_get += (time.time() - start)
+                failed = [r for r in responses[:repeat] if r != "OK"]
+                if failed:
+                    print(f"SET failed: {failed[0]}")
+                if "(nil)" in responses[repeat:]:
+                    print(f"GET failed: Key not found")
 
                 print(f"\n Key: {key_kb}KB | Value: {val_kb}KB | Repeats: {repeat}")
-                print(f"   Avg SET Time: {total_set/repeat:.6f}s")
-                print(f"   Avg GET Time: {total_get/repeat:.6f}s")
+                print(f"   Batch Time: {total:.6f}s")
+                print(f"   Avg Command Time: {total/(2*repeat):.6f}s")
+                print(f"   Throughput: {2*repeat/total:.0f} ops/sec")
 
     def close(self):
         if self.socket: